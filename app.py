@@ -1,4 +1,6 @@
+import logging
 from src.web_app import app
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     app.run()
\ No newline at end of file
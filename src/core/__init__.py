@@ -2,7 +2,10 @@ from src.core.transcript import (
     extract_transcript,
     extract_video_id,
 )
-from src.core.sections import create_section_timestamps
+from src.core.sections import (
+    create_section_timestamps,
+    create_section_timestamps_batch,
+)
 from src.core.formatting import (
     format_sections_for_youtube,
     format_transcript_for_display,
@@ -12,6 +15,7 @@ __all__ = [
     "extract_video_id",
     "extract_transcript",
     "create_section_timestamps",
+    "create_section_timestamps_batch",
     "format_sections_for_youtube",
     "format_transcript_for_display",
 ]
@@ -1,5 +1,9 @@
+from functools import lru_cache
+from operator import itemgetter
 from typing import Any
 
+_start_and_text = itemgetter("start", "text")
+
 
 def format_sections_for_youtube(sections: list[dict[str, Any]]) -> str:
     """Formats sections into YouTube description format.
@@ -20,13 +24,13 @@ def format_sections_for_youtube(sections: list[dict[str, Any]]) -> str:
     """
 
     try:
-        output = []
-        for i, section in enumerate(sections, 1):
-            minutes = int(section["start"] // 60)
-            seconds = int(section["start"] % 60)
-            timestamp = f"{minutes:02d}:{seconds:02d}"
-            output.append(f"{i}. {timestamp} {section['title']}")
-        return "\n".join(output)
+        return "\n".join(
+            [
+                "%d. %02d:%02d %s"
+                % (i, *divmod(int(section["start"]), 60), section["title"])
+                for i, section in enumerate(sections, 1)
+            ]
+        )
     except KeyError as e:
         raise KeyError(f"Missing required key in section data: {str(e)}")
 
@@ -57,4 +61,25 @@ def format_transcript_for_display(transcript: list[dict[str, Any]]) -> str:
         TypeError: If 'start' is not a numeric value
     """
 
-    return "\n".join(f"[{seg['start']:.1f}s] {seg['text']}" for seg in transcript)
+    return _format_transcript_lines(tuple(map(_start_and_text, transcript)))
+
+
+@lru_cache(maxsize=4)
+def _format_transcript_lines(segments: tuple[tuple[float, str], ...]) -> str:
+    """Formats (start, text) pairs into timestamped lines.
+
+    Cached so the same transcript, formatted for display and again for the
+    AI prompt, is only rendered once.
+
+    Args:
+        segments: Tuple of (start, text) pairs
+
+    Returns:
+        Formatted transcript as a single string
+    """
+
+    lines = []
+    append = lines.append
+    for segment in segments:
+        append("[%.1fs] %s" % segment)
+    return "\n".join(lines)
@@ -1,14 +1,355 @@
+import hashlib
+import logging
 import os
 from google import genai
-from google.genai import types
-from typing import Any
+from google.genai import errors, types
+from typing import Any, Iterator
+from src.core import formatting
 from src.utils import file_io, json_utils
+import random
 import time
 
+logger = logging.getLogger(__name__)
+
 # MODEL="gemini-2.0-flash-lite-001" # best model that allows to cache context (for free)
 # MODEL="gemini-1.5-flash-002" # best model that allows to cache context (for free)
 MODEL="gemini-2.5-flash"
 
+# Range-independent rules, stored with the transcript in the cached content
+SYSTEM_INSTRUCTION = (
+    "You create YouTube-style chapter markers from the transcript you are "
+    "given. Return ONLY valid JSON with this structure: "
+    "[{'start': seconds, 'title': string}, ...]\n\n"
+    "Rules:\n"
+    "- Start time in seconds (float)\n"
+    "- Always take the whole transcript and its timestamps into account\n"
+    "- Capture key topics\n"
+    "- Output ONLY the JSON array\n"
+    "- In the language of the transcript."
+)
+
+# Rules for generating sections for several transcripts in one request
+BATCH_SYSTEM_INSTRUCTION = (
+    "You create YouTube-style chapter markers for each of the numbered "
+    "transcripts you are given. Return ONLY valid JSON with this structure: "
+    "[[{'start': seconds, 'title': string}, ...], ...] with one inner array "
+    "per transcript, in the order of the transcripts.\n\n"
+    "Rules:\n"
+    "- Start time in seconds (float)\n"
+    "- Always take each whole transcript and its timestamps into account\n"
+    "- Capture key topics\n"
+    "- Output ONLY the JSON array\n"
+    "- Each transcript's titles in the language of that transcript."
+)
+
+# Lifetime of a cached transcript on the Gemini side
+CACHE_TTL_SECONDS = 3600
+
+# How long a failed cache creation is remembered when the cause may be
+# transient (e.g. an overloaded model or a network error)
+CACHE_FAILURE_RETRY_SECONDS = 60
+
+# One client per API key, so repeated calls reuse the same HTTP session
+_client_cache: dict[str, genai.Client] = {}
+
+# Cached content names per (API key, transcript digest), with local expiry;
+# None marks a transcript that could not be cached
+_content_cache: dict[tuple[str, str], tuple[str | None, float]] = {}
+
+
+def _read_api_key() -> str:
+    """Reads the Google API key from the environment.
+
+    Returns:
+        API key
+
+    Raises:
+        ValueError: If GOOGLE_API_KEY is not set
+    """
+
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        raise ValueError("GOOGLE_API_KEY not found in environment variables")
+    return api_key
+
+
+def _get_client(api_key: str) -> genai.Client:
+    """Returns a memoized Gemini client for the given API key.
+
+    Args:
+        api_key: Google API key used to authenticate the client
+
+    Returns:
+        Cached genai.Client instance
+    """
+
+    client = _client_cache.get(api_key)
+    if client is None:
+        client = _client_cache[api_key] = genai.Client(api_key=api_key)
+    return client
+
+
+def get_client() -> genai.Client:
+    """Returns the Gemini client for the configured API key.
+
+    The client is created on first use and reused afterwards, so calling
+    this ahead of time (e.g. while the transcript is fetched) takes the
+    setup cost off the request path.
+
+    Returns:
+        Cached genai.Client instance
+
+    Raises:
+        ValueError: If GOOGLE_API_KEY is not set
+    """
+
+    return _get_client(_read_api_key())
+
+
+def _content_cache_key(api_key: str, formatted_transcript: str) -> tuple[str, str]:
+    """Returns the _content_cache key for a transcript.
+
+    Args:
+        api_key: API key the cached content belongs to
+        formatted_transcript: Transcript formatted for the prompt
+
+    Returns:
+        Tuple of (API key, SHA-256 hex digest of the transcript)
+    """
+
+    digest = hashlib.sha256(formatted_transcript.encode("utf-8")).hexdigest()
+    return api_key, digest
+
+
+def _get_cached_content(
+    client: genai.Client, api_key: str, formatted_transcript: str
+) -> str | None:
+    """Returns a Gemini cached content holding the transcript and rules.
+
+    The cache is reused for repeated calls with the same transcript (e.g. a
+    re-generation with other section ranges) until shortly before its TTL
+    runs out.
+
+    Args:
+        client: Gemini client
+        api_key: API key the client belongs to
+        formatted_transcript: Transcript formatted for the prompt
+
+    Returns:
+        Name of the cached content, or None if caching is unavailable
+        (e.g. the transcript is below the model's minimum cache size)
+    """
+
+    key = _content_cache_key(api_key, formatted_transcript)
+    now = time.monotonic()
+
+    entry = _content_cache.get(key)
+    if entry is not None and entry[1] > now:
+        return entry[0]
+
+    # Drop expired entries so the mapping does not grow for the lifetime
+    # of a long-running server
+    for stale_key, (_, expiry) in list(_content_cache.items()):
+        if expiry <= now:
+            _content_cache.pop(stale_key, None)
+
+    try:
+        cache = client.caches.create(
+            model=MODEL,
+            config=types.CreateCachedContentConfig(
+                system_instruction=SYSTEM_INSTRUCTION,
+                contents=[formatted_transcript],
+                ttl=f"{CACHE_TTL_SECONDS}s",
+            )
+        )
+    except Exception as e:
+        logger.warning(
+            "Context caching unavailable, sending transcript inline: %s", e
+        )
+        # Remember the failure, so later requests skip the doomed round
+        # trip. A transcript below the minimum cache size fails every time;
+        # other errors may be transient and are retried sooner.
+        error_txt = str(e).lower()
+        too_small = "too small" in error_txt or "min_total_token_count" in error_txt
+        retry_after = CACHE_TTL_SECONDS if too_small else CACHE_FAILURE_RETRY_SECONDS
+        _content_cache[key] = (None, now + retry_after)
+        return None
+
+    # Stop reusing the cache a minute before it expires server-side
+    _content_cache[key] = (cache.name, now + CACHE_TTL_SECONDS - 60)
+    return cache.name
+
+
+def _generate_stream(
+    client: genai.Client,
+    contents: str | list[str],
+    config: types.GenerateContentConfig,
+) -> Iterator[str]:
+    """Streams model output, retrying while the model is overloaded.
+
+    A 503 before the first chunk is retried with exponential backoff;
+    once text has been yielded, errors are raised.
+
+    Args:
+        client: Gemini client
+        contents: Request contents
+        config: Generation config
+
+    Yields:
+        Chunks of the model response text
+
+    Raises:
+        Exception: If API call fails
+    """
+
+    retry_delay = 5  # seconds – initial wait
+    max_delay = 60   # cap so we don't wait forever between tries
+
+    # Only the generate_content_stream call is repeated on retry
+    while True:
+        streamed = False
+        try:
+            for chunk in client.models.generate_content_stream(
+                model=MODEL,
+                contents=contents,
+                config=config,
+            ):
+                if chunk.text:
+                    streamed = True
+                    yield chunk.text
+            return
+
+        except Exception as err:
+            # detect the "model is overloaded" case
+            error_txt = str(err).lower()
+            is_503 = ("503" in error_txt) and ("unavailable" in error_txt)
+
+            if not is_503 or streamed:
+                # Some other exception, or part of the answer is already out
+                # – re-raise immediately
+                raise
+
+            # Otherwise, log and wait before the next attempt. Jitter
+            # (50-100 % of the delay) keeps clients that failed
+            # together from retrying in lockstep.
+            delay = retry_delay * (0.5 + random.random() * 0.5)
+            logger.warning("Model overloaded (503). Retrying in %.1fs …", delay)
+            time.sleep(delay)
+            retry_delay = min(retry_delay * 2, max_delay)
+
+
+def stream_section_timestamps(
+    transcript: list[dict[str, Any]],
+    section_count_range: tuple[int, int] = (15, 20),
+    title_length_range: tuple[int, int] = (3, 8),
+) -> Iterator[str]:
+    """Streams the raw AI response for section timestamps.
+
+    Text chunks are yielded as the model produces them, so callers can show
+    progress before the full response has arrived. A 503 before the first
+    chunk is retried; once text has been yielded, errors are raised. If the
+    cached transcript no longer exists on the server, the request is sent
+    once more with the transcript inline.
+
+    Args:
+        transcript: Transcript data from extract_transcript()
+        section_count_range: Number of sections, [lower limit, upper limit]
+        title_length_range: Words in the title, [lower limit, upper limit]
+
+    Yields:
+        Chunks of the model response text
+
+    Raises:
+        Exception: If API call fails
+    """
+
+    api_key = _read_api_key()
+
+    formatted_transcript = formatting.format_transcript_for_display(transcript)
+
+    client = _get_client(api_key)
+
+    prompt = (
+        f"Create {section_count_range[0]}-{section_count_range[1]} sections "
+        f"with {title_length_range[0]}-{title_length_range[1]} word titles."
+    )
+
+    # The transcript and static rules live in the cached content; without
+    # a cache they are sent inline with the request
+    cache_name = _get_cached_content(client, api_key, formatted_transcript)
+    if cache_name:
+        config = types.GenerateContentConfig(
+            cached_content=cache_name,
+            # thinking_config=types.ThinkingConfig(thinking_budget=0) # Disables thinking
+            temperature=0.0,  # Adjust for creativity vs accuracy
+        )
+
+        streamed = False
+        try:
+            for text in _generate_stream(client, prompt, config):
+                streamed = True
+                yield text
+            return
+
+        except errors.ClientError as err:
+            # The cached content may be gone server-side (deleted, or owned
+            # by another process); forget it and send the transcript inline
+            if streamed or err.code not in (403, 404):
+                raise
+            logger.warning(
+                "Cached content %s unavailable, sending transcript inline: %s",
+                cache_name,
+                err,
+            )
+            _content_cache.pop(
+                _content_cache_key(api_key, formatted_transcript), None
+            )
+
+    config = types.GenerateContentConfig(
+        system_instruction=SYSTEM_INSTRUCTION,
+        temperature=0.0,
+    )
+
+    yield from _generate_stream(client, [formatted_transcript, prompt], config)
+
+
+def _is_section_list(sections: Any) -> bool:
+    """Checks that parsed JSON is a list of section dictionaries.
+
+    Args:
+        sections: Parsed JSON value
+
+    Returns:
+        True if every item has 'start' and 'title'
+    """
+
+    return isinstance(sections, list) and all(
+        isinstance(sec, dict) and "start" in sec and "title" in sec
+        for sec in sections
+    )
+
+
+def parse_section_timestamps(response_text: str) -> list[dict[str, Any]]:
+    """Parses and validates the AI response for section timestamps.
+
+    Args:
+        response_text: Full response text from stream_section_timestamps()
+
+    Returns:
+        List of sections with start times and titles
+
+    Raises:
+        ValueError: If the response does not contain valid sections
+    """
+
+    sections = json_utils.extract_json(response_text.strip())
+
+    if not _is_section_list(sections):
+        raise ValueError("Invalid section format in AI response")
+
+    return sections
+
+
 def create_section_timestamps(
     transcript: list[dict[str, Any]],
     section_count_range: tuple[int, int] = (15, 20),
@@ -31,98 +372,86 @@ def create_section_timestamps(
     """
 
     try:
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if not api_key:
-            raise ValueError("GOOGLE_API_KEY not found in environment variables")
-
-        formatted_transcript = "\n".join(
-            f"[{segment['start']:.1f}s] {segment['text']}" for segment in transcript
+        response_text = "".join(
+            stream_section_timestamps(
+                transcript, section_count_range, title_length_range
+            )
         )
+        sections = parse_section_timestamps(response_text)
+
+        if output_file:
+            file_io.write_to_file(sections, output_file)
+            logger.info("Section timestamps saved to %s", output_file)
 
-        client = genai.Client(api_key=api_key)
+        return sections
 
-        models = client.models.list()
-        for model in models:
-            print(f"Model Name: {model.name}")
-            print("Supported Methods:")
-            for action in model.supported_actions:
-                print(f" - {action}")
-            print()  # Print a newline for better readability
+    except Exception as e:
+        logger.error("Error generating sections: %s", e)
+        raise
 
-        # Create a cached content object
-        cache = client.caches.create(
-            model=MODEL,
-            config=types.CreateCachedContentConfig(
-                system_instruction="Remember to each exact timestamp the text to summaries to section titles.",
-                contents=[formatted_transcript],
-            )
-        )
 
-        prompt = (
-            "Create YouTube-style chapter markers from this transcript. "
-            "Return ONLY valid JSON with this structure: "
-            "[{'start': seconds, 'title': string}, ...]\n\n"
-            "Rules:\n"
-            f"1. Create {section_count_range[0]}-{section_count_range[1]} sections\n"
-            "2. Start time in seconds (float)\n"
-            "3. Always take the whole transcript and its timestamps into account\n"
-            f"4. {title_length_range[0]}-{title_length_range[1]} word titles\n"
-            "5. Capture key topics\n"
-            "6. Output ONLY the JSON array\n"
-            "7. In the language of the transcript.\n\n"
-            # f"Transcript:\n{formatted_transcript}"
+def create_section_timestamps_batch(
+    transcripts: list[list[dict[str, Any]]],
+    section_count_range: tuple[int, int] = (15, 20),
+    title_length_range: tuple[int, int] = (3, 8),
+    output_file: str | None = None,
+) -> list[list[dict[str, Any]]]:
+    """Generates section timestamps for several transcripts in one AI call.
+
+    All transcripts are sent in a single request, so the model round trip
+    is paid once instead of per video. Best suited to a few short to
+    medium transcripts; long ones are better served one at a time by
+    create_section_timestamps, which can use context caching.
+
+    Args:
+        transcripts: Transcript data from extract_transcript(), one per video
+        section_count_range: Number of sections per video, [lower limit, upper limit]
+        title_length_range: Words in the title, [lower limit, upper limit]
+        output_file: Optional file path to save the sections of all videos
+
+    Returns:
+        List of section lists, in the order of the transcripts
+
+    Raises:
+        Exception: If API call fails or response is invalid
+    """
+
+    if not transcripts:
+        return []
+
+    try:
+        client = get_client()
+
+        contents = [
+            f"Transcript {i}:\n{formatting.format_transcript_for_display(t)}"
+            for i, t in enumerate(transcripts, 1)
+        ]
+        contents.append(
+            f"Create {section_count_range[0]}-{section_count_range[1]} sections "
+            f"with {title_length_range[0]}-{title_length_range[1]} word titles "
+            f"for each of the {len(transcripts)} transcripts."
         )
+        config = types.GenerateContentConfig(
+            system_instruction=BATCH_SYSTEM_INSTRUCTION,
+            temperature=0.0,
+        )
+
+        response_text = "".join(_generate_stream(client, contents, config))
+        batch = json_utils.extract_json(response_text.strip())
 
-        retry_delay = 5  # seconds – initial wait
-        max_delay = 60   # cap so we don't wait forever between tries
-
-        while True:
-            try:
-                response = client.models.generate_content(
-                    model=MODEL,
-                    contents=prompt,
-                    config=types.GenerateContentConfig(
-                        cached_content=cache.name,
-                        # thinking_config=types.ThinkingConfig(thinking_budget=0) # Disables thinking
-                        temperature=0.0,  # Adjust for creativity vs accuracy
-                    )
-                )
-                break
-
-            except Exception as err:
-                # detect the "model is overloaded" case
-                error_txt = str(err).lower()
-                is_503 = ("503" in error_txt) and ("unavailable" in error_txt)
-
-                if not is_503:
-                    # Some other exception – re-raise immediately
-                    raise
-
-                # Otherwise, log and wait before the next attempt
-                print(
-                    f"Model overloaded (503). Retrying in {retry_delay}s …",
-                    flush=True,
-                )
-                time.sleep(retry_delay)
-                retry_delay = min(retry_delay * 2, max_delay)
-
-        sections = json_utils.extract_json(response.text.strip())
-
-        # Validate sections format
-        # if not all(("start" in sec and "title" in sec) for sec in sections):
-        #     raise ValueError("Invalid section format in AI response")
-        if not isinstance(sections, list) or not all(
-            isinstance(sec, dict) and "start" in sec and "title" in sec
-            for sec in sections
+        if (
+            not isinstance(batch, list)
+            or len(batch) != len(transcripts)
+            or not all(_is_section_list(sections) for sections in batch)
         ):
-            raise ValueError("Invalid section format in AI response")
+            raise ValueError("Invalid batch section format in AI response")
 
         if output_file:
-            file_io.write_to_file(sections, output_file)
-            print(f"Section timestamps saved to {output_file}")
+            file_io.write_to_file(batch, output_file)
+            logger.info("Section timestamps saved to %s", output_file)
 
-        return sections
+        return batch
 
     except Exception as e:
-        print(f"Error generating sections: {e}")
-        raise
\ No newline at end of file
+        logger.error("Error generating sections: %s", e)
+        raise
@@ -1,7 +1,37 @@
 from typing import Any
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import os
 import re
+import threading
+import time
+from pathlib import Path
 from src.utils import file_io
-from youtube_transcript_api import YouTubeTranscriptApi
+from youtube_transcript_api import NoTranscriptFound, YouTubeTranscriptApi
+
+logger = logging.getLogger(__name__)
+
+# Single pass over the input: an optional watch/short-link prefix followed by
+# an 11-character ID that is not part of a longer token
+_VIDEO_ID_PATTERN = re.compile(
+    r"(?:(?:https?://)?(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)"
+    r"|(?<![A-Za-z0-9_-]))"
+    r"([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])"
+)
+
+# Fetched transcripts are kept here, keyed by video ID and target language
+_CACHE_DIR = Path.home() / ".cache" / "youtube-transcript"
+_CACHE_MAX_AGE_SECONDS = 7 * 24 * 60 * 60
+
+# Recently loaded transcripts with the time their data was fetched from
+# YouTube, so warm hits skip the disk but still honour the max age
+_MEMO_SIZE = 32
+_memo: OrderedDict[tuple[str, str | None], tuple[list[dict[str, Any]], float]] = (
+    OrderedDict()
+)
+_memo_lock = threading.Lock()
 
 
 def _convert_transcript_to_dict(transcript_data) -> list[dict[str, Any]]:
@@ -23,11 +53,193 @@ def _convert_transcript_to_dict(transcript_data) -> list[dict[str, Any]]:
     ]
 
 
+def _cache_path(video_id: str, translate_to: str | None) -> Path:
+    """Returns the cache file for a transcript.
+
+    The file name is a hash of the key, so arbitrary language codes from
+    the web form cannot escape the cache directory.
+
+    Args:
+        video_id: YouTube video ID
+        translate_to: Optional target language code
+
+    Returns:
+        Path of the cache file
+    """
+
+    key = hashlib.sha1(f"{video_id}|{translate_to or ''}".encode("utf-8"))
+    return _CACHE_DIR / f"{key.hexdigest()}.json"
+
+
+def _is_fresh(fetched_at: float) -> bool:
+    """Checks whether transcript data is younger than the max age.
+
+    Args:
+        fetched_at: Time the data was fetched from YouTube (epoch seconds)
+
+    Returns:
+        True if the transcript can still be used
+    """
+
+    return time.time() - fetched_at < _CACHE_MAX_AGE_SECONDS
+
+
+def _cache_mtime(path: Path) -> float | None:
+    """Returns the modification time of a cache file.
+
+    Args:
+        path: Cache file path
+
+    Returns:
+        Modification time in epoch seconds, or None if the file is missing
+    """
+
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
+def _write_cache(path: Path, transcript_data: list[dict[str, Any]]) -> None:
+    """Atomically stores transcript data in the cache.
+
+    The data is written to a temporary file next to the target and moved
+    into place, so concurrent readers never see a partial file. Failures
+    are reported but never abort the transcript extraction.
+
+    Args:
+        path: Cache file path
+        transcript_data: Serializable transcript segments
+    """
+
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        file_io.write_to_file(transcript_data, str(tmp_path))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning("Could not cache transcript: %s", e)
+        tmp_path.unlink(missing_ok=True)
+
+
+def _fetch_and_convert(transcript) -> list[dict[str, Any]]:
+    """Fetches a single transcript and converts it to dictionaries.
+
+    Args:
+        transcript: Transcript object from a YouTubeTranscriptApi listing
+
+    Returns:
+        List of transcript segments as dictionaries
+    """
+
+    transcript_data = transcript.fetch()
+
+    logger.info("Transcript Details:")
+    logger.info("- Video ID: %s", transcript.video_id)
+    logger.info("- Language: %s (%s)", transcript.language, transcript.language_code)
+    logger.info("- Generated: %s", "Yes" if transcript.is_generated else "No")
+
+    return _convert_transcript_to_dict(transcript_data)
+
+
+def _fetch_transcript(
+    video_id: str, translate_to: str | None = None
+) -> list[dict[str, Any]]:
+    """Fetches a transcript from YouTube.
+
+    Args:
+        video_id: YouTube video ID (11-character string)
+        translate_to: Optional language code for translation (e.g., 'en')
+
+    Returns:
+        List of transcript segments as dictionaries
+    """
+
+    transcript_list = YouTubeTranscriptApi().list(video_id)
+
+    # A transcript already in the target language needs no translation
+    if translate_to:
+        try:
+            transcript = transcript_list.find_transcript([translate_to])
+        except NoTranscriptFound:
+            pass
+        else:
+            return _fetch_and_convert(transcript)
+
+    # Find the first manually created transcript, or fallback to the first
+    # (generated) one, in a single pass
+    first = None
+    transcript = None
+    for candidate in transcript_list:
+        if first is None:
+            first = candidate
+        if not candidate.is_generated:
+            transcript = candidate
+            break
+    transcript = transcript or first
+    if transcript is None:
+        raise ValueError(f"No transcripts available for video {video_id}")
+
+    if translate_to:
+        transcript = transcript.translate(translate_to)
+
+    return _fetch_and_convert(transcript)
+
+
+def _load_transcript(
+    video_id: str, translate_to: str | None = None
+) -> list[dict[str, Any]]:
+    """Loads a transcript from memory, the disk cache or YouTube.
+
+    Memoized per process, so warm hits (e.g. repeated web requests for the
+    same video) do not touch the disk either. Memoized and cached data is
+    only used while it is younger than the max age.
+
+    Args:
+        video_id: YouTube video ID (11-character string)
+        translate_to: Optional language code for translation (e.g., 'en')
+
+    Returns:
+        List of transcript segments as dictionaries
+    """
+
+    key = (video_id, translate_to)
+    with _memo_lock:
+        entry = _memo.get(key)
+        if entry is not None and _is_fresh(entry[1]):
+            _memo.move_to_end(key)
+            return entry[0]
+
+    cache_path = _cache_path(video_id, translate_to)
+    fetched_at = _cache_mtime(cache_path)
+
+    if fetched_at is not None and _is_fresh(fetched_at):
+        with open(cache_path, encoding="utf-8") as f:
+            transcript_data = json.load(f)
+        logger.info("Loaded cached transcript from %s", cache_path)
+    else:
+        fetched_at = time.time()
+        transcript_data = _fetch_transcript(video_id, translate_to)
+        _write_cache(cache_path, transcript_data)
+
+    with _memo_lock:
+        _memo[key] = (transcript_data, fetched_at)
+        _memo.move_to_end(key)
+        if len(_memo) > _MEMO_SIZE:
+            _memo.popitem(last=False)
+
+    return transcript_data
+
+
 def extract_transcript(
     video_id: str, output_file: str | None = None, translate_to: str | None = None
 ) -> list[dict[str, Any]]:
     """Extracts YouTube transcript and optionally translates it.
 
+    Transcripts are cached on disk for a week and in memory per video ID
+    and target language, so repeated calls for the same video skip the
+    YouTube round-trips.
+
     Args:
         video_id: YouTube video ID (11-character string)
         output_file: Optional file path to save transcript
@@ -41,42 +253,18 @@ def extract_transcript(
     """
 
     try:
-        transcript_list = YouTubeTranscriptApi().list(video_id)
-        transcripts = list(transcript_list)
-
-        # Find the first manually created transcript, or fallback to generated
-        transcript = next(
-            (snippet for snippet in transcripts if not snippet.is_generated),
-            transcripts[0],  # First transcript if no manually created found
-        )
-        # transcript = [line.fetch() for line in transcript_list][0]
-        # transcript = next(
-        #     (t for t in transcript_list if not t.is_generated), transcript_list[0]
-        # )
-
-        if translate_to:
-            transcript_data = transcript.translate(translate_to).fetch()
-        else:
-            transcript_data = transcript.fetch()
-
-        serializable_data = _convert_transcript_to_dict(transcript_data)
-
-        print(f"\nTranscript Details:")
-        print(f"- Video ID: {transcript.video_id}")
-        print(f"- Language: {transcript.language} ({transcript.language_code})")
-        print(f"- Generated: {'Yes' if transcript.is_generated else 'No'}")
-
-        # transcript = transcript.to_raw_data()
+        # Copy so callers cannot modify the memoized list
+        serializable_data = list(_load_transcript(video_id, translate_to))
 
         if output_file:
             file_io.write_to_file(serializable_data, output_file)
-            print(f"Transcript saved to {output_file}")
+            logger.info("Transcript saved to %s", output_file)
 
         # return transcript
         return serializable_data
 
     except Exception as e:
-        print(f"Error retrieving transcript: {e}")
+        logger.error("Error retrieving transcript: %s", e)
         raise
 
 
@@ -93,15 +281,8 @@ def extract_video_id(url: str) -> str:
         ValueError: in case an invalid ID or YouTube URL was passed.
     """
 
-    patterns = [
-        r"(?:https?:\/\/)?(?:www\.)?youtube\.com\/watch\?v=([a-zA-Z0-9_-]{11})",
-        r"(?:https?:\/\/)?(?:www\.)?youtu\.be\/([a-zA-Z0-9_-]{11})",
-        r"([a-zA-Z0-9_-]{11})",
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
+    match = _VIDEO_ID_PATTERN.search(url)
+    if match:
+        return match.group(1)
 
     raise ValueError("Invalid YouTube URL or ID")
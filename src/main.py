@@ -1,3 +1,4 @@
+import logging
 from dotenv import load_dotenv
 from core import transcript, sections, formatting
 
@@ -5,6 +6,9 @@ from core import transcript, sections, formatting
 # Load environment variables once at startup
 load_dotenv()
 
+# Show progress messages from the core modules; raise the level to silence them
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+
 
 if __name__ == "__main__":
     # Configuration
@@ -1,6 +1,17 @@
 import json
 from typing import Union, Any, List, Dict
 
+try:
+    import orjson
+except ImportError:  # optional speed-up, stdlib json is the fallback
+    orjson = None
+
+__all__ = ["write_to_file"]
+
+# json.dump emits many small chunks; a large buffer coalesces them into
+# few write calls
+_WRITE_BUFFER_SIZE = 1 << 20
+
 
 def write_to_file(
     content: Union[List[Dict[str, Any]], Dict[str, Any], str], filepath: str
@@ -17,7 +28,18 @@ def write_to_file(
     """
 
     try:
-        with open(filepath, "w", encoding="utf-8") as f:
+        if orjson is not None and isinstance(content, (list, dict)):
+            # Serialized straight to UTF-8 bytes and written in one call
+            data = orjson.dumps(
+                content, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+            )
+            with open(filepath, "wb") as f:
+                f.write(data)
+            return
+
+        with open(
+            filepath, "w", encoding="utf-8", buffering=_WRITE_BUFFER_SIZE
+        ) as f:
             if isinstance(content, (list, dict)):
                 json.dump(content, f, indent=2, ensure_ascii=False)
             elif isinstance(content, str):
@@ -1,5 +1,57 @@
 import json
-import re
+
+try:
+    import orjson
+except ImportError:  # optional speed-up, stdlib json is the fallback
+    orjson = None
+
+__all__ = ["extract_json"]
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers only
+# need to handle the stdlib exception
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _find_json_spans(text: str) -> list[tuple[int, int]]:
+    """Finds all balanced JSON arrays in a text.
+
+    Walks the text once, keeping a stack of open bracket positions and
+    tracking string and escape state inside them, so brackets in string
+    values are ignored and a stray '[' in prose that never closes does
+    not hide an array after it.
+
+    Args:
+        text: Text to scan
+
+    Returns:
+        (begin, end) slice bounds of every balanced array, ordered by
+        start position (outer arrays before the arrays nested in them)
+    """
+
+    spans = []
+    stack = []
+    in_string = False
+    escaped = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            # Quotes only start a string inside a bracket, not in prose
+            in_string = bool(stack)
+        elif char == "[" or char == "{":
+            stack.append((i, char))
+        elif (char == "]" or char == "}") and stack:
+            begin, opener = stack.pop()
+            if opener == "[":
+                spans.append((begin, i + 1))
+
+    spans.sort()
+    return spans
 
 
 def extract_json(response_text: str) -> list[dict]:
@@ -16,22 +68,24 @@ def extract_json(response_text: str) -> list[dict]:
     """
 
     try:
-        return json.loads(response_text)
+        return _loads(response_text)
     except json.JSONDecodeError:
-        # Handle Markdown code block format
-        match = re.search(r"```(?:json)?\s*(\[.*\])\s*```", response_text, re.DOTALL)
-        if match:
-            try:
-                return json.loads(match.group(1).strip())
-            except json.JSONDecodeError:
-                pass
-
-        # Try to find the first JSON array
-        array_match = re.search(r"(\[.*\])", response_text, re.DOTALL)
-        if array_match:
-            try:
-                return json.loads(array_match.group(1).strip())
-            except json.JSONDecodeError:
-                pass
+        pass
+
+    spans = _find_json_spans(response_text)
+
+    # Prefer arrays starting after the first Markdown code fence, then fall
+    # back to the ones before it
+    fence = response_text.find("```")
+    if fence > 0:
+        spans = [span for span in spans if span[0] > fence] + [
+            span for span in spans if span[0] < fence
+        ]
+
+    for begin, end in spans:
+        try:
+            return _loads(response_text[begin:end])
+        except json.JSONDecodeError:
+            pass
 
     raise ValueError("Failed to extract JSON from response")
@@ -1,10 +1,23 @@
-from typing import Any
+from typing import Any, Iterator, Mapping
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import io
+import json
+import logging
+import threading
 from dotenv import load_dotenv
 from src.core import transcript, sections, formatting
-import tempfile
 import sys
 from pathlib import Path
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import (
+    Flask,
+    Response,
+    render_template,
+    request,
+    jsonify,
+    send_file,
+    stream_with_context,
+)
 
 def _load_dotenv_next_to_executable() -> None:
     """ Loads a dotenv file named ".env" located next to the executable if the script is being run as a frozen executable. Otherwise, it will attempt to locate the ".env" file two directories above the current script file. If found, the environment variables defined in the file will be loaded into the system.
@@ -37,6 +50,57 @@ app = Flask(
     static_folder=str(static_folder),
 )
 
+# Most recently generated sections per video ID, so they can be downloaded
+# again without posting the text back
+_SECTIONS_CACHE_SIZE = 32
+_sections_cache: OrderedDict[str, str] = OrderedDict()
+_sections_cache_lock = threading.Lock()
+
+# Prepares the Gemini client while transcripts are fetched; kept free of
+# slow work so client setup never queues behind transcript downloads
+_warm_up_executor = ThreadPoolExecutor(max_workers=2)
+
+# Upper limit for video IDs in one batch request, which bounds the YouTube
+# fetches and the prompt size per request
+_MAX_BATCH_VIDEOS = 5
+
+# Fetches the transcripts of a batch request concurrently
+_batch_fetch_executor = ThreadPoolExecutor(max_workers=_MAX_BATCH_VIDEOS)
+
+
+def _remember_sections(video_id: str, sections_text: str) -> None:
+    """Stores generated sections, evicting the least recently used entry.
+
+    Args:
+        video_id: YouTube video ID
+        sections_text: Formatted section text
+    """
+
+    with _sections_cache_lock:
+        _sections_cache[video_id] = sections_text
+        _sections_cache.move_to_end(video_id)
+        if len(_sections_cache) > _SECTIONS_CACHE_SIZE:
+            _sections_cache.popitem(last=False)
+
+
+def _sections_attachment(video_id: str, sections_text: str) -> Response:
+    """Builds a text file attachment for section timestamps.
+
+    Args:
+        video_id: YouTube video ID, used for the file name
+        sections_text: Formatted section text
+
+    Returns:
+        Text file attachment served from memory
+    """
+
+    return send_file(
+        io.BytesIO(sections_text.encode("utf-8")),
+        as_attachment=True,
+        download_name=f"{video_id}_sections.txt",
+        mimetype="text/plain",
+    )
+
 
 @app.route("/")
 def index() -> str:
@@ -49,6 +113,84 @@ def index() -> str:
     return render_template("index.html")
 
 
+def _read_section_params(
+    form: Mapping[str, str],
+) -> tuple[str, str | None, tuple[int, int], tuple[int, int]]:
+    """Reads the section generation parameters from a submitted form.
+
+    Args:
+        form: Request form data (see generate_sections for the fields)
+
+    Returns:
+        Tuple of (video_id, translate_to, section_count_range,
+        title_length_range); translate_to is None when left blank
+
+    Raises:
+        KeyError: If video_id is missing
+        ValueError: If the video ID or a numeric field is invalid
+    """
+
+    video_id = transcript.extract_video_id(form["video_id"])
+    return (video_id, *_read_generation_options(form))
+
+
+def _read_generation_options(
+    form: Mapping[str, str],
+) -> tuple[str | None, tuple[int, int], tuple[int, int]]:
+    """Reads the options shared by all section generation endpoints.
+
+    Args:
+        form: Request form data (see generate_sections for the fields)
+
+    Returns:
+        Tuple of (translate_to, section_count_range, title_length_range);
+        translate_to is None when left blank
+
+    Raises:
+        ValueError: If a numeric field is invalid
+    """
+
+    translate_to = form.get("translate_to", "") or None
+    section_count_range = (
+        int(form.get("min_sections", 10)),
+        int(form.get("max_sections", 15)),
+    )
+    title_length_range = (
+        int(form.get("min_title_words", 3)),
+        int(form.get("max_title_words", 6)),
+    )
+    return translate_to, section_count_range, title_length_range
+
+
+def _extract_transcript_for_sections(
+    video_id: str, translate_to: str | None, output_file: str | None
+) -> list[dict[str, Any]]:
+    """Fetches the transcript while the Gemini client is set up.
+
+    Both are independent network-bound steps, so the client is created in
+    the background and is ready once the transcript has arrived.
+
+    Args:
+        video_id: YouTube video ID
+        translate_to: Optional language code for translation
+        output_file: Optional file path to save transcript
+
+    Returns:
+        Transcript data from extract_transcript()
+
+    Raises:
+        ValueError: If GOOGLE_API_KEY is not set
+        Exception: If transcript retrieval fails
+    """
+
+    client_future = _warm_up_executor.submit(sections.get_client)
+    transcript_data = transcript.extract_transcript(
+        video_id=video_id, translate_to=translate_to, output_file=output_file
+    )
+    client_future.result()
+    return transcript_data
+
+
 @app.route("/generate-sections", methods=["POST"])
 def generate_sections() -> jsonify:
     """Generates YouTube-style section timestamps from a video transcript.
@@ -79,20 +221,13 @@ def generate_sections() -> jsonify:
     """
 
     try:
-        video_id = transcript.extract_video_id(request.form["video_id"])
-        translate_to = request.form.get("translate_to", "")
-        section_count_range = (
-            int(request.form.get("min_sections", 10)),
-            int(request.form.get("max_sections", 15)),
-        )
-        title_length_range = (
-            int(request.form.get("min_title_words", 3)),
-            int(request.form.get("max_title_words", 6)),
+        video_id, translate_to, section_count_range, title_length_range = (
+            _read_section_params(request.form)
         )
 
         # Get transcript
-        transcript_data = transcript.extract_transcript(
-            video_id=video_id, translate_to=translate_to if translate_to else None, output_file="./transcript.json"
+        transcript_data = _extract_transcript_for_sections(
+            video_id, translate_to, "./transcript.json"
         )
 
         # Generate sections
@@ -104,6 +239,7 @@ def generate_sections() -> jsonify:
 
         # Format for YouTube
         youtube_sections = formatting.format_sections_for_youtube(sections_data)
+        _remember_sections(video_id, youtube_sections)
 
         return jsonify(
             {"success": True, "sections": youtube_sections, "video_id": video_id}
@@ -113,8 +249,132 @@ def generate_sections() -> jsonify:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@app.route("/generate-sections-stream", methods=["POST"])
+def generate_sections_stream() -> Response:
+    """Streams section generation progress as newline-delimited JSON.
+
+    Takes the same form parameters as generate_sections. While the model
+    answers, each text chunk is sent as its own line so the page can show
+    progress before the full response has arrived.
+
+    Returns:
+        application/x-ndjson response with one JSON object per line:
+        - {"partial": str} for each chunk of the model response
+        - a final line matching the generate_sections JSON response
+    """
+
+    form = request.form.copy()
+
+    def generate() -> Iterator[str]:
+        try:
+            video_id, translate_to, section_count_range, title_length_range = (
+                _read_section_params(form)
+            )
+
+            transcript_data = _extract_transcript_for_sections(
+                video_id, translate_to, "./transcript.json"
+            )
+
+            chunks = []
+            for chunk in sections.stream_section_timestamps(
+                transcript=transcript_data,
+                section_count_range=section_count_range,
+                title_length_range=title_length_range,
+            ):
+                chunks.append(chunk)
+                yield json.dumps({"partial": chunk}) + "\n"
+
+            sections_data = sections.parse_section_timestamps("".join(chunks))
+            youtube_sections = formatting.format_sections_for_youtube(sections_data)
+            _remember_sections(video_id, youtube_sections)
+
+            yield json.dumps(
+                {"success": True, "sections": youtube_sections, "video_id": video_id}
+            ) + "\n"
+
+        except Exception as e:
+            yield json.dumps({"success": False, "error": str(e)}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+@app.route("/generate-sections-batch", methods=["POST"])
+def generate_sections_batch() -> jsonify:
+    """Generates section timestamps for several videos in one AI request.
+
+    Request Form Parameters:
+        video_ids: YouTube video IDs or URLs, separated by newlines or commas
+        translate_to, min_sections, max_sections, min_title_words,
+        max_title_words: Same as for generate_sections, applied to every video
+
+    Returns:
+        JSON response with:
+        - success: Boolean indicating operation status
+        - results: List of {"video_id", "sections"} objects in request
+          order (if successful)
+        - error: Error message (if failed)
+
+    HTTP Status Codes:
+        200: Successful operation
+        400: No video IDs or more than _MAX_BATCH_VIDEOS were given
+        500: Server error during processing
+    """
+
+    try:
+        raw_ids = request.form.get("video_ids", "").replace(",", "\n")
+        video_ids = [
+            transcript.extract_video_id(value.strip())
+            for value in raw_ids.splitlines()
+            if value.strip()
+        ]
+        if not video_ids:
+            return jsonify({"success": False, "error": "No video IDs given"}), 400
+        if len(video_ids) > _MAX_BATCH_VIDEOS:
+            return jsonify(
+                {
+                    "success": False,
+                    "error": f"At most {_MAX_BATCH_VIDEOS} videos per batch",
+                }
+            ), 400
+
+        translate_to, section_count_range, title_length_range = (
+            _read_generation_options(request.form)
+        )
+
+        # The transcripts and the client are independent, so all are
+        # fetched at once; transcripts are not saved to a file here
+        client_future = _warm_up_executor.submit(sections.get_client)
+        transcript_futures = [
+            _batch_fetch_executor.submit(
+                transcript.extract_transcript,
+                video_id=video_id,
+                translate_to=translate_to,
+            )
+            for video_id in video_ids
+        ]
+        transcripts = [future.result() for future in transcript_futures]
+        client_future.result()
+
+        batch = sections.create_section_timestamps_batch(
+            transcripts=transcripts,
+            section_count_range=section_count_range,
+            title_length_range=title_length_range,
+        )
+
+        results = []
+        for video_id, sections_data in zip(video_ids, batch):
+            youtube_sections = formatting.format_sections_for_youtube(sections_data)
+            _remember_sections(video_id, youtube_sections)
+            results.append({"video_id": video_id, "sections": youtube_sections})
+
+        return jsonify({"success": True, "results": results})
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
 @app.route("/download-sections", methods=["POST"])
-def download_sections() -> send_file:
+def download_sections() -> Response:
     """Provides downloadable text file of generated sections.
 
     Request Form Parameters:
@@ -125,39 +385,36 @@ def download_sections() -> send_file:
         Text file attachment with section timestamps
 
     Notes:
-        Creates a temporary file that is automatically deleted after send
+        The file is served from memory, nothing is written to disk
     """
 
-    sections_text = request.form["sections"]
-    video_id = request.form["video_id"]
+    return _sections_attachment(request.form["video_id"], request.form["sections"])
 
-    # Create temporary file
-    with tempfile.NamedTemporaryFile(mode="w+", delete=False, suffix=".txt") as tmp:
-        tmp.write(sections_text)
-        tmp_path = tmp.name
 
-    return send_file(
-        tmp_path,
-        as_attachment=True,
-        download_name=f"{video_id}_sections.txt",
-        mimetype="text/plain",
-    )
-
-
-def format_transcript_for_display(transcript: list[dict[str, Any]]) -> str:
-    """Formats transcript data for human-readable display.
+@app.route("/download-sections/<video_id>", methods=["GET"])
+def download_cached_sections(video_id: str) -> Response:
+    """Provides the most recently generated sections for a video.
 
     Args:
-        transcript: List of transcript segments as dictionaries
-          Each dictionary should contain:
-          - 'start': Start time in seconds
-          - 'text': Transcript text
+        video_id: YouTube video ID
 
     Returns:
-        Formatted transcript string with timestamps and text
+        Text file attachment with section timestamps
+
+    HTTP Status Codes:
+        200: Successful operation
+        404: No sections were generated for this video since startup
     """
 
-    return "\n".join(f"[{seg['start']:.1f}s] {seg['text']}" for seg in transcript)
+    with _sections_cache_lock:
+        sections_text = _sections_cache.get(video_id)
+        if sections_text is not None:
+            _sections_cache.move_to_end(video_id)
+
+    if sections_text is None:
+        return jsonify({"success": False, "error": "No sections for this video"}), 404
+
+    return _sections_attachment(video_id, sections_text)
 
 
 if __name__ == "__main__":
@@ -166,4 +423,5 @@ if __name__ == "__main__":
     Starts a development server on port 5000 with debug mode enabled.
     """
 
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     app.run(debug=True, port=5000)